@@ -0,0 +1,131 @@
+"""Benchmark scrape cycles on recorded pages, serial vs. the pipeline
+
+Record fixtures once (needs network access):
+    python benchmark.py --record fixtures/
+
+Then compare throughput offline:
+    python benchmark.py fixtures/ [--repeat 20] [--workers 4]
+
+Recorded pages are served to the shared fetch session in place of the
+real sites, so both runs go through the same fetch, fallback and parse
+code the bot uses. The pipeline keeps one process pool across cycles, as
+the bot and coordinator do; its first cycle, which starts the pool, is
+reported separately.
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+
+import requests
+from requests.adapters import BaseAdapter
+
+import fetcher
+from pipeline import scrape_pipelined
+from scraper import HTML_PAGES, fetch_page, scrape_feed_first
+
+def record(directory):
+    """Save each source's HTML page as <name>.html"""
+    os.makedirs(directory, exist_ok=True)
+    for name, (source, url, parser) in HTML_PAGES.items():
+        content = fetch_page(url)
+        with open(os.path.join(directory, f"{name}.html"), 'wb') as f:
+            f.write(content)
+        print(f"Recorded {source}: {len(content)} bytes")
+
+def load_fixtures(directory):
+    """Load recorded pages as (name, content) pairs"""
+    fixtures = []
+    for name in HTML_PAGES:
+        path = os.path.join(directory, f"{name}.html")
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                fixtures.append((name, f.read()))
+    return fixtures
+
+class FixtureAdapter(BaseAdapter):
+    """Answer requests from recorded pages; anything else (feeds) is a 404"""
+
+    def __init__(self, pages):
+        super().__init__()
+        self.pages = pages
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        content = self.pages.get(request.url)
+        if content is None:
+            response.status_code = 404
+            response.reason = 'Not Found'
+            response._content = b''
+        else:
+            response.status_code = 200
+            response.reason = 'OK'
+            response.headers['Content-Type'] = 'text/html'
+            response._content = content
+        return response
+
+    def close(self):
+        pass
+
+def benchmark(fixtures, repeat, workers):
+    names = [name for name, content in fixtures]
+    pages = {HTML_PAGES[name][1]: content for name, content in fixtures}
+    adapter = FixtureAdapter(pages)
+    fetcher.session.mount('http://', adapter)
+    fetcher.session.mount('https://', adapter)
+    fetcher.HOST_RATE = 10 ** 9
+    fetcher.DAILY_BUDGET = 10 ** 9
+
+    def cycle():
+        return sum(len(articles) for name, articles in
+                   scrape_pipelined(names, 5, parallel=len(names), parse_workers=workers))
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        serial_articles = sum(len(scrape_feed_first(name, 5)) for _ in range(repeat) for name in names)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cycle()
+        first_cycle = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pipelined_articles = sum(cycle() for _ in range(repeat))
+        pipelined = time.perf_counter() - start
+
+    pages_parsed = len(names) * repeat
+    total_bytes = sum(len(content) for content in pages.values()) * repeat
+    print(f"{repeat} cycles of {len(names)} pages, {total_bytes / 1e6:.1f} MB, {workers} workers")
+    print(f"  serial:      {serial:.2f}s  {pages_parsed / serial:.1f} pages/s  ({serial_articles} articles)")
+    print(f"  pipeline:    {pipelined:.2f}s  {pages_parsed / pipelined:.1f} pages/s  ({pipelined_articles} articles)")
+    print(f"  first cycle: {first_cycle:.2f}s (includes starting the pool)")
+    print(f"  speedup:     {serial / pipelined:.2f}x")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('fixtures', help="directory of recorded <source>.html pages")
+    parser.add_argument('--record', action='store_true',
+                        help="download fresh pages into the fixtures directory")
+    parser.add_argument('--repeat', type=int, default=20,
+                        help="scrape cycles to time (default: 20)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="parse processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record(args.fixtures)
+        return 0
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"No fixtures in {args.fixtures}; record some with --record", file=sys.stderr)
+        return 1
+
+    benchmark(fixtures, args.repeat, args.workers)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,29 +1,49 @@
 import discord
 from discord.ext import commands, tasks
+import asyncio
 import os
+import copy
 from datetime import datetime, time, timedelta
 import pytz
 import json
+from time import perf_counter
 from dotenv import load_dotenv
 from groq import Groq
-from scraper import (
-    scrape_all_sources,
-    scrape_bleeping_computer,
-    scrape_wired_security,
-    scrape_ars_technica_security,
-    scrape_krebs_security,
-    scrape_darknet_diaries,
-    scrape_with_retry
-)
+from scraper import check_darknet_diaries_changed
+from coordinator import listen
+from pipeline import scrape_sources
+from delivery import close_session, deliver, render, render_article_embed, render_with_embeds
+from prompt_builder import build_articles_text
+from store import SharedStore
 
 load_dotenv()
 TOKEN = os.getenv('DISCORD_TOKEN')
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 
+# Sharded deployment (see coordinator.py); leave unset to run one process
+SHARD_COUNT = os.getenv('SHARD_COUNT')
+SHARD_IDS = os.getenv('SHARD_IDS')
+COORDINATOR_SOCKET = os.getenv('COORDINATOR_SOCKET')
+SHARED_STORE = os.getenv('SHARED_STORE')
+
 intents = discord.Intents.default()
 intents.message_content = True
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+class NewsBot(commands.AutoShardedBot if SHARD_COUNT else commands.Bot):
+    async def close(self):
+        """Close the webhook session along with the Discord connection"""
+        await super().close()
+        await close_session()
+
+if SHARD_COUNT:
+    bot = NewsBot(
+        command_prefix='!',
+        intents=intents,
+        shard_count=int(SHARD_COUNT),
+        shard_ids=[int(shard_id) for shard_id in SHARD_IDS.split(',')] if SHARD_IDS else None
+    )
+else:
+    bot = NewsBot(command_prefix='!', intents=intents)
 
 # Initialize Groq client
 groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
@@ -32,28 +52,52 @@ groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
 USER_ID = 'YOUR_USER_ID_HERE'  # Replace with your Discord user ID
 user_timezone = pytz.timezone('America/Chicago')
 
-# File to store persistent data
-SETTINGS_FILE = 'bot_settings.json'
+# File to store persistent data (give each shard process its own; bot-wide
+# settings are kept in the shared store when there is one)
+SETTINGS_FILE = os.getenv('SETTINGS_FILE', 'bot_settings.json')
 
 # Default settings structure
 default_settings = {
-    'last_episode_title': None,
+    'seen_episode_ids': [],
+    'darknet_cache': {},
     'darknet_channel_id': None,
-    'daily_news_channel_id': None,
+    'daily_news_channel_ids': [],
+    'webhooks': {},
     'user_keywords': [],
     'sent_articles': {},
     'notification_times': ['08:00', '15:15'],
     'weekly_articles': [],
-    'notify_user': True
+    'notify_user': True,
+    'summary_token_budget': 1500
 }
 
 def load_settings():
     """Load settings from file"""
+    loaded = copy.deepcopy(default_settings)
     try:
         with open(SETTINGS_FILE, 'r') as f:
-            return json.load(f)
+            # Fill in keys added since the file was written
+            loaded.update(json.load(f))
     except FileNotFoundError:
-        return default_settings.copy()
+        pass
+    # Older settings files had a single digest channel
+    old_channel = loaded.pop('daily_news_channel_id', None)
+    if old_channel and old_channel not in loaded['daily_news_channel_ids']:
+        loaded['daily_news_channel_ids'].append(old_channel)
+    # Episodes used to be tracked by the latest title; with no seen IDs yet,
+    # the next check records the current episodes without notifying
+    loaded.pop('last_episode_title', None)
+    # Sent articles used to be one history for the whole bot; give it to the
+    # digest channels so their next digest doesn't repeat it
+    old_sent = {link: timestamp for link, timestamp in loaded['sent_articles'].items()
+                if isinstance(timestamp, str)}
+    if old_sent:
+        loaded['sent_articles'] = {
+            str(channel_id): dict(old_sent) for channel_id in loaded['daily_news_channel_ids']
+        }
+    for channel_id, history in loaded.pop('digest_history', {}).items():
+        loaded['sent_articles'].setdefault(channel_id, {}).update(history)
+    return loaded
 
 def save_settings(settings):
     """Save settings to file"""
@@ -63,25 +107,145 @@ def save_settings(settings):
 # Load settings on startup
 settings = load_settings()
 
-def is_article_new(article_link):
-    """Check if article hasn't been sent in last 24 hours"""
+# Prompt and latency numbers from the most recent AI summary
+last_summary_stats = {}
+
+# De-dup, subscriptions and bot-wide settings shared by all shard processes
+store = SharedStore(SHARED_STORE) if SHARED_STORE else None
+
+# Settings that apply to the whole bot rather than one shard process
+GLOBAL_SETTINGS = ('user_keywords', 'notification_times', 'notify_user', 'summary_token_budget')
+
+async def get_setting(key):
+    """Read a setting, from the shared store for bot-wide settings"""
+    if store and key in GLOBAL_SETTINGS:
+        return await asyncio.to_thread(store.get_setting, key, settings[key])
+    return settings[key]
+
+async def set_setting(key, value):
+    """Change a setting, in the shared store for bot-wide settings"""
+    if store and key in GLOBAL_SETTINGS:
+        await asyncio.to_thread(store.set_setting, key, value)
+    else:
+        settings[key] = value
+        save_settings(settings)
+
+# Latest articles published by the scrape coordinator, by source name
+coordinator_articles = {}
+coordinator_scraped_at = None
+coordinator_interval = 900
+coordinator_task = None
+
+NEWS_SOURCES = ('bleeping', 'wired', 'ars', 'krebs')
+
+def coordinator_snapshot():
+    """Articles from the coordinator's latest cycle, or None if there is none
+    
+    A cycle older than twice the coordinator's interval means it has stopped
+    publishing, so its articles are ignored and the shard scrapes for itself.
+    """
+    if not coordinator_articles or coordinator_scraped_at is None:
+        return None
+    age = (datetime.now() - coordinator_scraped_at).total_seconds()
+    if age > 2 * coordinator_interval:
+        print(f"Coordinator data is {age:.0f}s old, scraping locally")
+        return None
+    return coordinator_articles
+
+async def get_articles(name):
+    """Articles for one source, from the coordinator if connected
+    
+    Otherwise the source is scraped through the pipeline, so HTML is parsed
+    in the shared process pool. Scraping runs on a worker thread, so
+    commands waiting on a rate limited host don't hold up the event loop.
+    """
+    snapshot = coordinator_snapshot()
+    if snapshot and name in snapshot:
+        return snapshot[name]
+    limit = 3 if name == 'darknet' else 5
+    results = await asyncio.to_thread(scrape_sources, [name], limit)
+    return results[name]
+
+async def get_all_articles():
+    """Articles from all news sources, from the coordinator if connected"""
+    results = coordinator_snapshot()
+    if results is None:
+        results = await asyncio.to_thread(scrape_sources, NEWS_SOURCES)
+    return [article for name in NEWS_SOURCES for article in results.get(name, [])]
+
+async def follow_coordinator():
+    """Keep coordinator_articles up to date with each published cycle"""
+    global coordinator_scraped_at, coordinator_interval
+    async for message in listen(COORDINATOR_SOCKET):
+        coordinator_articles.clear()
+        coordinator_articles.update(message['articles'])
+        coordinator_scraped_at = datetime.fromisoformat(message['scraped_at'])
+        coordinator_interval = message.get('interval', coordinator_interval)
+        print(f"Received scrape cycle {message['cycle']} from coordinator")
+
+async def subscribed_channels(kind):
+    """Channels subscribed to 'daily_news' or 'darknet' that this process serves"""
+    if store:
+        channel_ids = await asyncio.to_thread(store.channels, kind)
+    elif kind == 'daily_news':
+        channel_ids = settings['daily_news_channel_ids']
+    else:
+        channel_ids = [settings['darknet_channel_id']] if settings['darknet_channel_id'] else []
+    # Each shard only delivers to channels in its own guilds
+    return [channel_id for channel_id in channel_ids if bot.get_channel(channel_id)]
+
+async def set_subscription(kind, channel_id, enabled):
+    """Subscribe or unsubscribe a channel from 'daily_news' or 'darknet'"""
+    if store:
+        if enabled:
+            await asyncio.to_thread(store.subscribe, kind, channel_id)
+        else:
+            await asyncio.to_thread(store.unsubscribe, kind, channel_id)
+    elif kind == 'daily_news':
+        if enabled and channel_id not in settings['daily_news_channel_ids']:
+            settings['daily_news_channel_ids'].append(channel_id)
+        elif not enabled and channel_id in settings['daily_news_channel_ids']:
+            settings['daily_news_channel_ids'].remove(channel_id)
+    else:
+        settings['darknet_channel_id'] = channel_id if enabled else None
+    save_settings(settings)
+
+def claim_local(channel_id, links, limit=None):
+    """Mark links as sent to a channel in the settings file
+    
+    Same contract as SharedStore.claim: returns the links the channel
+    hasn't had in the last 24 hours, stopping after `limit` of them.
+    """
     current_time = datetime.now().isoformat()
     
     # Clean old articles (older than 24 hours)
     cutoff = (datetime.now() - timedelta(hours=24)).isoformat()
     settings['sent_articles'] = {
-        link: timestamp 
-        for link, timestamp in settings['sent_articles'].items() 
-        if timestamp > cutoff
+        channel: {link: timestamp for link, timestamp in history.items() if timestamp > cutoff}
+        for channel, history in settings['sent_articles'].items()
     }
-    
-    # Check if article is new
-    if article_link in settings['sent_articles']:
-        return False
-    
-    settings['sent_articles'][article_link] = current_time
+    history = settings['sent_articles'].setdefault(str(channel_id), {})
+    
+    claimed = []
+    for link in links:
+        if limit is not None and len(claimed) >= limit:
+            break
+        if link not in history:
+            history[link] = current_time
+            claimed.append(link)
     save_settings(settings)
-    return True
+    return claimed
+
+async def claim_new_links(channel_id, links, limit=None):
+    """Links that haven't been sent to this channel in the last 24 hours
+    
+    The returned links are marked as sent. !news and the digest share this
+    per-channel history, kept in the shared store when there is one so
+    every shard sees it, or in the settings file otherwise.
+    """
+    if store:
+        return await asyncio.to_thread(store.claim, str(channel_id), links, 24, limit)
+    return claim_local(channel_id, links, limit)
 
 def matches_keywords(article, keywords):
     """Check if article matches user keywords"""
@@ -90,30 +254,41 @@ def matches_keywords(article, keywords):
     text = (article['title'] + ' ' + article['description']).lower()
     return any(keyword.lower() in text for keyword in keywords)
 
-def filter_articles(articles):
+async def filter_articles(articles, channel_id):
     """Filter articles by keywords and duplicates"""
+    keywords = await get_setting('user_keywords')
+    new_links = set(await claim_new_links(channel_id, [article['link'] for article in articles]))
+    
     filtered = []
     for article in articles:
-        if is_article_new(article['link']) and matches_keywords(article, settings['user_keywords']):
+        if article['link'] in new_links and matches_keywords(article, keywords):
             filtered.append(article)
+        # A link listed twice is only new the first time
+        new_links.discard(article['link'])
     return filtered
 
-def get_ai_summary(articles, max_articles=10):
-    """Generate AI summary of articles using Groq"""
+def get_ai_summary(articles, max_articles=10, started=None, keywords=(), token_budget=1500):
+    """Generate AI summary of articles using Groq
+    
+    `started` is the perf_counter() time the request began (before
+    scraping), so the recorded latency covers the whole summary.
+    """
+    if started is None:
+        started = perf_counter()
+    
     if not groq_client:
         return "Error: Groq API key not configured. Add GROQ_API_KEY to your .env file."
     
     if not articles:
         return "No articles to summarize."
     
-    # Limit to top articles
-    articles = articles[:max_articles]
-    
-    # Format articles for AI
-    articles_text = "\n\n".join([
-        f"Article {i+1}:\nTitle: {a['title']}\nSource: {a['source']}\nDescription: {a['description']}"
-        for i, a in enumerate(articles)
-    ])
+    # Clean, de-duplicate and rank the top articles into a compact list
+    articles_text, stats = build_articles_text(
+        articles,
+        keywords=keywords,
+        max_articles=max_articles,
+        token_budget=token_budget
+    )
     
     # Create prompt
     prompt = f"""You are a cybersecurity expert. Below are today's top cybersecurity news articles. 
@@ -142,17 +317,36 @@ Executive Summary:"""
             temperature=0.3,
             max_tokens=1000
         )
+        stats['latency'] = perf_counter() - started
+        
+        usage = getattr(chat_completion, 'usage', None)
+        if usage:
+            stats['prompt_tokens'] = usage.prompt_tokens
+        last_summary_stats.clear()
+        last_summary_stats.update(stats)
+        print(f"AI summary: {stats['articles_used']}/{stats['articles_in']} articles "
+              f"({stats['duplicates_removed']} duplicates, {stats['budget_dropped']} over budget), "
+              f"~{stats['tokens_saved']} prompt tokens saved, {stats['latency']:.2f}s end to end")
         
         return chat_completion.choices[0].message.content
     
     except Exception as e:
         return f"Error generating summary: {str(e)}"
 
+async def articles_tracked():
+    """Number of articles sent in the last 24 hours"""
+    if store:
+        return await asyncio.to_thread(store.count_sent)
+    return sum(len(history) for history in settings['sent_articles'].values())
+
 @bot.event
 async def on_ready():
+    global coordinator_task
     print(f'{bot.user} has connected to Discord!')
-    print(f"Settings loaded: {len(settings['sent_articles'])} articles tracked")
-    print(f"Keywords: {settings['user_keywords']}")
+    print(f"Settings loaded: {await articles_tracked()} articles tracked")
+    print(f"Keywords: {await get_setting('user_keywords')}")
+    if COORDINATOR_SOCKET and coordinator_task is None:
+        coordinator_task = asyncio.create_task(follow_coordinator())
     check_darknet_diaries.start()
     daily_news_digest.start()
     weekly_summary.start()
@@ -167,19 +361,19 @@ async def get_news(ctx, source: str = 'all'):
     
     if source == 'all':
         await ctx.send('Fetching news from all sources...')
-        articles = scrape_all_sources()
+        articles = await get_all_articles()
     elif source == 'bleeping':
         await ctx.send('Fetching news from Bleeping Computer...')
-        articles = scrape_with_retry(scrape_bleeping_computer)
+        articles = await get_articles('bleeping')
     elif source == 'wired':
         await ctx.send('Fetching news from WIRED...')
-        articles = scrape_with_retry(scrape_wired_security)
+        articles = await get_articles('wired')
     elif source == 'ars':
         await ctx.send('Fetching news from Ars Technica...')
-        articles = scrape_with_retry(scrape_ars_technica_security)
+        articles = await get_articles('ars')
     elif source == 'krebs':
         await ctx.send('Fetching news from Krebs on Security...')
-        articles = scrape_with_retry(scrape_krebs_security)
+        articles = await get_articles('krebs')
     else:
         await ctx.send('Invalid source! Use: all, bleeping, wired, ars, or krebs')
         return
@@ -189,7 +383,7 @@ async def get_news(ctx, source: str = 'all'):
         return
     
     # Filter articles
-    filtered = filter_articles(articles)
+    filtered = await filter_articles(articles, ctx.channel.id)
     
     if not filtered:
         await ctx.send('No new articles matching your filters.')
@@ -220,7 +414,7 @@ async def get_darknet(ctx):
     """Check latest Darknet Diaries episodes"""
     await ctx.send('Fetching latest Darknet Diaries episodes...')
     
-    episodes = scrape_with_retry(scrape_darknet_diaries)
+    episodes = await get_articles('darknet')
     
     if not episodes:
         await ctx.send('Couldn\'t fetch episodes right now. Try again later!')
@@ -243,11 +437,12 @@ async def get_darknet(ctx):
 @bot.command(name='watch_darknet')
 async def watch_darknet(ctx):
     """Set this channel to receive notifications for new Darknet Diaries episodes"""
-    settings['darknet_channel_id'] = ctx.channel.id
+    await set_subscription('darknet', ctx.channel.id, True)
     
-    episodes = scrape_with_retry(scrape_darknet_diaries)
+    episodes = await get_articles('darknet')
     if episodes:
-        settings['last_episode_title'] = episodes[0]['title']
+        settings['seen_episode_ids'] = [episode['id'] for episode in episodes]
+        settings['darknet_cache'] = {}
         save_settings(settings)
         await ctx.send(f'I will notify this channel when new Darknet Diaries episodes are released!\n'
                       f'Latest episode: {episodes[0]["title"]}')
@@ -257,27 +452,67 @@ async def watch_darknet(ctx):
 @bot.command(name='unwatch_darknet')
 async def unwatch_darknet(ctx):
     """Stop receiving Darknet Diaries notifications"""
-    settings['darknet_channel_id'] = None
-    save_settings(settings)
+    await set_subscription('darknet', ctx.channel.id, False)
     await ctx.send('Darknet Diaries notifications disabled.')
 
 @bot.command(name='daily_news')
 async def setup_daily_news(ctx):
     """Enable daily news digest in this channel"""
-    settings['daily_news_channel_id'] = ctx.channel.id
-    save_settings(settings)
-    times = ' and '.join(settings['notification_times'])
+    await set_subscription('daily_news', ctx.channel.id, True)
+    times = ' and '.join(await get_setting('notification_times'))
     await ctx.send(f'Daily news digest enabled!\n'
                    f'You\'ll receive 1 article from each source at: {times}\n'
                    f'(Central Time)')
 
 @bot.command(name='stop_daily_news')
 async def stop_daily_news(ctx):
-    """Disable daily news digest"""
-    settings['daily_news_channel_id'] = None
-    save_settings(settings)
+    """Disable daily news digest in this channel"""
+    await set_subscription('daily_news', ctx.channel.id, False)
     await ctx.send('Daily news digest disabled.')
 
+@bot.command(name='use_webhook')
+async def use_webhook(ctx):
+    """Deliver scheduled notifications in this channel through a webhook"""
+    url = settings['webhooks'].get(str(ctx.channel.id))
+    if url:
+        # Reuse the webhook we already made here; Discord caps each channel at 15
+        try:
+            await discord.Webhook.from_url(url, client=bot).fetch()
+            await ctx.send('Scheduled notifications in this channel are already sent through a webhook.')
+            return
+        except discord.NotFound:
+            pass
+        except discord.HTTPException as e:
+            await ctx.send(f'Could not check the existing webhook: {e}')
+            return
+    
+    try:
+        webhook = await ctx.channel.create_webhook(name='Cybersecurity News')
+    except discord.Forbidden:
+        await ctx.send('I need the Manage Webhooks permission in this channel to do that.')
+        return
+    except discord.HTTPException as e:
+        await ctx.send(f'Could not create a webhook: {e}')
+        return
+    
+    settings['webhooks'][str(ctx.channel.id)] = webhook.url
+    save_settings(settings)
+    await ctx.send('Scheduled notifications in this channel will now be sent through a webhook.')
+
+@bot.command(name='stop_webhook')
+async def stop_webhook(ctx):
+    """Go back to sending scheduled notifications as the bot"""
+    url = settings['webhooks'].pop(str(ctx.channel.id), None)
+    save_settings(settings)
+    
+    if url:
+        try:
+            webhook = discord.Webhook.from_url(url, client=bot)
+            await webhook.delete()
+        except discord.HTTPException:
+            pass
+    await ctx.send('Scheduled notifications in this channel will be sent as the bot.')
+
 @bot.command(name='set_keywords')
 async def set_keywords(ctx, *keywords):
     """
@@ -286,24 +521,24 @@ async def set_keywords(ctx, *keywords):
     Use !set_keywords clear to remove all filters
     """
     if keywords and keywords[0].lower() == 'clear':
-        settings['user_keywords'] = []
-        save_settings(settings)
+        await set_setting('user_keywords', [])
         await ctx.send('Keyword filters cleared. You\'ll receive all news.')
     elif keywords:
-        settings['user_keywords'] = list(keywords)
-        save_settings(settings)
+        await set_setting('user_keywords', list(keywords))
         await ctx.send(f'Filtering news for keywords: {", ".join(keywords)}')
     else:
-        if settings['user_keywords']:
-            await ctx.send(f'Current keywords: {", ".join(settings["user_keywords"])}')
+        current = await get_setting('user_keywords')
+        if current:
+            await ctx.send(f'Current keywords: {", ".join(current)}')
         else:
             await ctx.send('No keyword filters set. Use: !set_keywords ransomware breach')
 
 @bot.command(name='show_keywords')
 async def show_keywords(ctx):
     """Show current keyword filters"""
-    if settings['user_keywords']:
-        await ctx.send(f'Current keyword filters: {", ".join(settings["user_keywords"])}')
+    keywords = await get_setting('user_keywords')
+    if keywords:
+        await ctx.send(f'Current keyword filters: {", ".join(keywords)}')
     else:
         await ctx.send('No keyword filters active. All news will be shown.')
 
@@ -318,17 +553,24 @@ async def ai_summary(ctx, num_articles: int = 10):
         await ctx.send('AI summary is not configured. Please add GROQ_API_KEY to your .env file.')
         return
     
+    started = perf_counter()
     await ctx.send(f'Analyzing top {num_articles} cybersecurity articles...')
     
     # Scrape all sources
-    articles = scrape_all_sources()
+    articles = await get_all_articles()
     
     if not articles:
         await ctx.send('Could not fetch any articles right now. Try again later.')
         return
     
     # Generate summary
-    summary = get_ai_summary(articles, max_articles=num_articles)
+    summary = get_ai_summary(
+        articles,
+        max_articles=num_articles,
+        started=started,
+        keywords=await get_setting('user_keywords'),
+        token_budget=await get_setting('summary_token_budget')
+    )
     
     # Split into chunks if too long (Discord has 2000 char limit)
     if len(summary) > 1900:
@@ -342,16 +584,30 @@ async def ai_summary(ctx, num_articles: int = 10):
             description=summary,
             color=0x00FF00
         )
-        embed.set_footer(text=f"Analyzed {len(articles[:num_articles])} articles | Powered by Groq")
+        analyzed = last_summary_stats.get('articles_used', len(articles[:num_articles]))
+        embed.set_footer(text=f"Analyzed {analyzed} articles | Powered by Groq")
         await ctx.send(embed=embed)
 
+@bot.command(name='set_token_budget')
+async def set_token_budget(ctx, budget: int):
+    """
+    Set the prompt token budget for AI summaries
+    Example: !set_token_budget 1000
+    """
+    if budget < 100:
+        await ctx.send('Token budget must be at least 100.')
+        return
+    
+    await set_setting('summary_token_budget', budget)
+    await ctx.send(f'AI summaries will use at most ~{budget} tokens of article text.')
+
 @bot.command(name='notify_me')
 async def toggle_notifications(ctx):
     """Toggle whether you get tagged (@mentioned) on scheduled notifications"""
-    settings['notify_user'] = not settings['notify_user']
-    save_settings(settings)
+    notify_user = not await get_setting('notify_user')
+    await set_setting('notify_user', notify_user)
     
-    if settings['notify_user']:
+    if notify_user:
         await ctx.send('You will be tagged on scheduled notifications (you\'ll get push notifications)')
     else:
         await ctx.send('Tag notifications disabled (you won\'t get pinged, but messages will still be sent)')
@@ -372,8 +628,7 @@ async def set_notification_times(ctx, time1: str, time2: str = None):
             datetime.strptime(time2, '%H:%M')
             times.append(time2)
         
-        settings['notification_times'] = times
-        save_settings(settings)
+        await set_setting('notification_times', times)
         
         times_str = ' and '.join(times)
         await ctx.send(f'Notification times set to: {times_str} (Central Time)')
@@ -383,8 +638,11 @@ async def set_notification_times(ctx, time1: str, time2: str = None):
 @bot.command(name='stats')
 async def show_stats(ctx):
     """Show bot statistics"""
-    total_tracked = len(settings['sent_articles'])
-    keywords = len(settings['user_keywords'])
+    total_tracked = await articles_tracked()
+    user_keywords = await get_setting('user_keywords')
+    notification_times = await get_setting('notification_times')
+    notify_user = await get_setting('notify_user')
+    keywords = len(user_keywords)
     
     embed = discord.Embed(
         title="Bot Statistics",
@@ -392,125 +650,182 @@ async def show_stats(ctx):
     )
     embed.add_field(name="Articles Tracked (24h)", value=str(total_tracked), inline=True)
     embed.add_field(name="Active Keywords", value=str(keywords), inline=True)
-    embed.add_field(name="Notification Times", value=', '.join(settings['notification_times']), inline=False)
-    embed.add_field(name="Tag on Notify", value="Yes" if settings['notify_user'] else "No", inline=True)
-    
-    if settings['user_keywords']:
-        embed.add_field(name="Keywords", value=', '.join(settings['user_keywords']), inline=False)
+    embed.add_field(name="Notification Times", value=', '.join(notification_times), inline=False)
+    embed.add_field(name="Tag on Notify", value="Yes" if notify_user else "No", inline=True)
+    
+    if user_keywords:
+        embed.add_field(name="Keywords", value=', '.join(user_keywords), inline=False)
+    
+    if last_summary_stats:
+        embed.add_field(
+            name="Last AI Summary",
+            value=f"{last_summary_stats['articles_used']} articles, "
+                  f"~{last_summary_stats['tokens_saved']} prompt tokens saved, "
+                  f"{last_summary_stats['latency']:.2f}s end to end",
+            inline=False
+        )
     
     await ctx.send(embed=embed)
 
-@tasks.loop(hours=6)
+@tasks.loop(minutes=30)
 async def check_darknet_diaries():
-    """Check for new Darknet Diaries episodes every 6 hours"""
+    """Check for new Darknet Diaries episodes every 30 minutes
+    
+    Most checks end at a 304 or an unchanged page fingerprint, so only
+    the rare check that sees a new listing pays for a full parse. With a
+    coordinator, its latest episodes are used and nothing is fetched here.
+    """
     try:
-        if settings['darknet_channel_id'] is None:
+        channel_ids = await subscribed_channels('darknet')
+        if not channel_ids:
             return
         
         print("Checking for new Darknet Diaries episodes...")
-        episodes = scrape_with_retry(scrape_darknet_diaries)
+        snapshot = coordinator_snapshot()
+        if snapshot and 'darknet' in snapshot:
+            episodes = snapshot['darknet']
+        else:
+            episodes = await asyncio.to_thread(check_darknet_diaries_changed, settings['darknet_cache'])
         
         if not episodes:
             return
         
-        latest_episode = episodes[0]
+        seen = settings['seen_episode_ids']
         
-        if settings['last_episode_title'] is None:
-            settings['last_episode_title'] = latest_episode['title']
+        if not seen:
+            settings['seen_episode_ids'] = [episode['id'] for episode in episodes]
             save_settings(settings)
             return
         
-        if latest_episode['title'] != settings['last_episode_title']:
+        # Oldest first, so several new episodes arrive in release order
+        new_episodes = [episode for episode in episodes if episode['id'] not in seen][::-1]
+        
+        for episode in new_episodes:
+            seen.append(episode['id'])
+        settings['seen_episode_ids'] = seen[-50:]
+        save_settings(settings)
+        
+        notify_user = await get_setting('notify_user')
+        payloads = []
+        for latest_episode in new_episodes:
             print(f"New episode detected: {latest_episode['title']}")
-            settings['last_episode_title'] = latest_episode['title']
-            save_settings(settings)
+            embed = discord.Embed(
+                title=f"NEW DARKNET DIARIES EPISODE!",
+                description=f"**{latest_episode['title']}**",
+                url=latest_episode['link'],
+                color=0xFF0000
+            )
+            embed.add_field(
+                name="Description",
+                value=latest_episode['description'],
+                inline=False
+            )
+            if latest_episode.get('date'):
+                embed.add_field(name="Released", value=latest_episode['date'], inline=True)
+            embed.set_footer(text="Darknet Diaries by Jack Rhysider")
             
-            channel = bot.get_channel(settings['darknet_channel_id'])
-            if channel:
-                embed = discord.Embed(
-                    title=f"NEW DARKNET DIARIES EPISODE!",
-                    description=f"**{latest_episode['title']}**",
-                    url=latest_episode['link'],
-                    color=0xFF0000
-                )
-                embed.add_field(
-                    name="Description",
-                    value=latest_episode['description'],
-                    inline=False
-                )
-                if latest_episode.get('date'):
-                    embed.add_field(name="Released", value=latest_episode['date'], inline=True)
-                embed.set_footer(text="Darknet Diaries by Jack Rhysider")
-                
-                if settings['notify_user']:
-                    await channel.send(f"<@{USER_ID}>")
-                await channel.send(embed=embed)
+            if notify_user:
+                payloads.append(render(f"<@{USER_ID}>"))
+            payloads.append(render(embeds=[embed]))
+        
+        await deliver(bot, channel_ids, payloads, settings['webhooks'])
+        save_settings(settings)
     
     except Exception as e:
         print(f"Error in check_darknet_diaries: {e}")
 
+async def pick_new_article(articles, channel_id, keywords):
+    """First article matching the keywords that the channel hasn't had yet"""
+    matching = [article for article in articles if matches_keywords(article, keywords)]
+    claimed = await claim_new_links(channel_id, [article['link'] for article in matching], limit=1)
+    return next((article for article in matching if article['link'] in claimed), None)
+
+def render_digest(picks, notify_user):
+    """Render one consolidated digest message from (source name, color, article or status) picks"""
+    new_articles = [(color, article) for source_name, color, article in picks if isinstance(article, dict)]
+    
+    header = f'**Daily Cybersecurity News Digest** - {len(new_articles)} new'
+    # Tag user if enabled
+    if notify_user:
+        header = f'<@{USER_ID}> ' + header
+    
+    status = [
+        f'{source_name}: could not fetch' if article == 'failed' else f'{source_name}: nothing new'
+        for source_name, color, article in picks
+        if not isinstance(article, dict)
+    ]
+    if status:
+        header += '\n' + ' | '.join(status)
+    
+    embeds = [render_article_embed(article, color) for color, article in new_articles]
+    return render_with_embeds(header, embeds)
+
 @tasks.loop(minutes=1)
 async def daily_news_digest():
-    """Send daily news digest at configured times"""
+    """Send daily news digest at configured times
+    
+    Each channel gets only what is new to it since its last digest, in a
+    single message. Channels with the same delta share one rendered copy,
+    and article embeds are rendered once and cached across runs.
+    """
     try:
-        if settings['daily_news_channel_id'] is None:
+        channel_ids = await subscribed_channels('daily_news')
+        if not channel_ids:
             return
         
         now = datetime.now(user_timezone)
         current_time = now.strftime('%H:%M')
         
         # Check if current time matches any notification time
-        if current_time in settings['notification_times']:
+        if current_time in await get_setting('notification_times'):
             print(f"Sending daily news digest at {current_time}")
-            channel = bot.get_channel(settings['daily_news_channel_id'])
             
-            if channel:
-                # Tag user if enabled
-                if settings['notify_user']:
-                    await channel.send(f'<@{USER_ID}> **Daily Cybersecurity News Digest**')
-                else:
-                    await channel.send(f'**Daily Cybersecurity News Digest**')
-                
-                sources = [
-                    ('Bleeping Computer', scrape_bleeping_computer, 0xFF6B6B),
-                    ('WIRED', scrape_wired_security, 0x000000),
-                    ('Ars Technica', scrape_ars_technica_security, 0xFF4F00),
-                    ('Krebs on Security', scrape_krebs_security, 0x0066CC)
-                ]
-                
-                total_articles = 0
-                
-                for source_name, scraper_func, color in sources:
-                    articles = scrape_with_retry(scraper_func)
-                    
-                    if articles:
-                        # Filter and get first new article
-                        filtered = filter_articles(articles)
-                        
-                        if filtered:
-                            article = filtered[0]
-                            embed = discord.Embed(
-                                title=article['title'],
-                                url=article['link'],
-                                description=article['description'],
-                                color=color
-                            )
-                            embed.set_footer(text=f"Source: {article['source']}")
-                            await channel.send(embed=embed)
-                            total_articles += 1
-                            
-                            # Store for weekly summary
-                            settings['weekly_articles'].append({
-                                'article': article,
-                                'timestamp': datetime.now().isoformat()
-                            })
-                        else:
-                            await channel.send(f'{source_name}: No new articles matching your filters')
+            sources = [
+                ('Bleeping Computer', 'bleeping', 0xFF6B6B),
+                ('WIRED', 'wired', 0x000000),
+                ('Ars Technica', 'ars', 0xFF4F00),
+                ('Krebs on Security', 'krebs', 0x0066CC)
+            ]
+            results = await asyncio.gather(*(get_articles(name) for source_name, name, color in sources))
+            scraped = [(source_name, articles, color) for (source_name, name, color), articles in zip(sources, results)]
+            
+            # Work out each channel's delta; channels with the same delta
+            # share one rendered digest
+            keywords = await get_setting('user_keywords')
+            groups = {}
+            articles_by_link = {}
+            for channel_id in channel_ids:
+                key = []
+                for source_name, articles, color in scraped:
+                    if not articles:
+                        key.append((source_name, color, 'failed'))
+                        continue
+                    article = await pick_new_article(articles, channel_id, keywords)
+                    if article:
+                        articles_by_link[article['link']] = article
+                        key.append((source_name, color, article['link']))
                     else:
-                        await channel.send(f'Could not fetch from {source_name}')
-                
-                save_settings(settings)
-                await channel.send(f'Daily digest complete! {total_articles} articles delivered.')
+                        key.append((source_name, color, None))
+                groups.setdefault(tuple(key), []).append(channel_id)
+            
+            notify_user = await get_setting('notify_user')
+            delivered = 0
+            for key, group in groups.items():
+                picks = [
+                    (source_name, color, articles_by_link.get(link, link))
+                    for source_name, color, link in key
+                ]
+                delivered += await deliver(bot, group, render_digest(picks, notify_user), settings['webhooks'])
+            
+            # Store for weekly summary
+            for article in articles_by_link.values():
+                settings['weekly_articles'].append({
+                    'article': article,
+                    'timestamp': datetime.now().isoformat()
+                })
+            
+            print(f"Daily digest delivered to {delivered} channels ({len(groups)} distinct digests)")
+            save_settings(settings)
     
     except Exception as e:
         print(f"Error in daily_news_digest: {e}")
@@ -523,18 +838,20 @@ async def weekly_summary():
         
         # Check if it's Sunday at 10:00 AM
         if now.weekday() == 6 and now.hour == 10:
-            if settings['daily_news_channel_id'] is None:
+            channel_ids = await subscribed_channels('daily_news')
+            if not channel_ids:
                 return
             
             print("Sending weekly summary...")
-            channel = bot.get_channel(settings['daily_news_channel_id'])
             
-            if channel and settings['weekly_articles']:
+            if settings['weekly_articles']:
+                payloads = []
+                
                 # Tag user if enabled
-                if settings['notify_user']:
-                    await channel.send(f'<@{USER_ID}> **Weekly Cybersecurity Summary**')
+                if await get_setting('notify_user'):
+                    payloads.append(render(f'<@{USER_ID}> **Weekly Cybersecurity Summary**'))
                 else:
-                    await channel.send(f'**Weekly Cybersecurity Summary**')
+                    payloads.append(render(f'**Weekly Cybersecurity Summary**'))
                 
                 # Count articles by source
                 source_counts = {}
@@ -552,7 +869,9 @@ async def weekly_summary():
                     embed.add_field(name=source, value=f"{count} articles", inline=True)
                 
                 embed.set_footer(text="Stay informed, stay secure!")
-                await channel.send(embed=embed)
+                payloads.append(render(embeds=[embed]))
+                
+                await deliver(bot, channel_ids, payloads, settings['webhooks'])
                 
                 # Clear weekly articles
                 settings['weekly_articles'] = []
@@ -582,6 +901,7 @@ async def help_news(ctx):
     **AI Summary:**
     `!ai_summary` - Get AI-generated summary of top 10 articles
     `!ai_summary 15` - Summarize top 15 articles
+    `!set_token_budget 1000` - Limit article text sent to the AI
     
     **Daily Digest:**
     `!daily_news` - Enable daily digest in this channel
@@ -595,6 +915,8 @@ async def help_news(ctx):
     
     **Notification Settings:**
     `!notify_me` - Toggle @ mentions on/off for scheduled notifications
+    `!use_webhook` - Send scheduled notifications here through a webhook
+    `!stop_webhook` - Send scheduled notifications here as the bot again
     
     **Darknet Diaries:**
     `!darknet` - Check latest episodes
@@ -615,4 +937,5 @@ async def help_news(ctx):
     """
     await ctx.send(help_text)
 
-bot.run(TOKEN)
+if __name__ == "__main__":
+    bot.run(TOKEN)
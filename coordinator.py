@@ -0,0 +1,147 @@
+"""Scrape coordinator for running the bot as several shard processes
+
+One coordinator process scrapes every source once per cycle and publishes
+the normalised articles as a JSON line to every bot process connected to
+its Unix socket. New connections get the latest cycle straight away, so
+shards never scrape on their own while the coordinator is up. A source
+that fails in a cycle is published with its articles from the last cycle
+that succeeded. Each message carries the scrape interval, so shards can
+tell when the coordinator has stopped publishing.
+
+Usage:
+    python coordinator.py --socket /tmp/cyberbot.sock [--interval 900]
+    python coordinator.py --socket /tmp/cyberbot.sock --listen   # print cycles
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from pipeline import scrape_pipelined
+from scraper import SOURCES, normalize_article
+
+def scrape_cycle(limit=5):
+    """Scrape every source once; returns {source name: [articles]}"""
+    return {
+        name: [normalize_article(article) for article in articles]
+        for name, articles in scrape_pipelined(list(SOURCES), limit)
+    }
+
+class Coordinator:
+    def __init__(self, socket_path, interval):
+        self.socket_path = socket_path
+        self.interval = interval
+        self.subscribers = set()
+        self.latest = None
+        self.cycle = 0
+        # Last non-empty article list for each source
+        self.last_good = {}
+
+    async def handle_subscriber(self, reader, writer):
+        self.subscribers.add(writer)
+        print(f"Shard connected ({len(self.subscribers)} connected)")
+        try:
+            if self.latest:
+                writer.write(self.latest)
+                await writer.drain()
+            # Subscribers never send anything; wait for them to disconnect
+            await reader.read()
+        finally:
+            self.subscribers.discard(writer)
+            writer.close()
+            print(f"Shard disconnected ({len(self.subscribers)} connected)")
+
+    async def publish(self, articles):
+        self.cycle += 1
+        message = {
+            'cycle': self.cycle,
+            'scraped_at': datetime.now().isoformat(),
+            'interval': self.interval,
+            'articles': articles
+        }
+        self.latest = (json.dumps(message) + '\n').encode()
+
+        for writer in list(self.subscribers):
+            try:
+                writer.write(self.latest)
+                await writer.drain()
+            except (ConnectionError, OSError):
+                self.subscribers.discard(writer)
+
+    async def run(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self.handle_subscriber, path=self.socket_path)
+        print(f"Coordinator listening on {self.socket_path}")
+
+        async with server:
+            while True:
+                start = time.perf_counter()
+                try:
+                    articles = await asyncio.to_thread(scrape_cycle)
+                    for name, items in articles.items():
+                        if items:
+                            self.last_good[name] = items
+                        elif name in self.last_good:
+                            # Don't wipe the shards' copy because one fetch failed
+                            print(f"  {name}: no articles this cycle, keeping the previous cycle's")
+                            articles[name] = self.last_good[name]
+                    await self.publish(articles)
+                    total = sum(len(items) for items in articles.values())
+                    print(f"Cycle {self.cycle}: {total} articles to {len(self.subscribers)} shards "
+                          f"in {time.perf_counter() - start:.1f}s")
+                except Exception as e:
+                    print(f"Error in scrape cycle: {e}")
+                await asyncio.sleep(self.interval)
+
+async def listen(socket_path, retry_delay=5):
+    """Yield each cycle the coordinator publishes, reconnecting as needed"""
+    while True:
+        try:
+            reader, writer = await asyncio.open_unix_connection(socket_path, limit=2 ** 24)
+        except (ConnectionError, FileNotFoundError, OSError) as e:
+            print(f"Coordinator not reachable ({e}), retrying in {retry_delay}s")
+            await asyncio.sleep(retry_delay)
+            continue
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                yield json.loads(line)
+        except (ConnectionError, OSError) as e:
+            print(f"Lost connection to coordinator: {e}")
+        finally:
+            writer.close()
+        await asyncio.sleep(retry_delay)
+
+async def print_cycles(socket_path):
+    async for message in listen(socket_path):
+        counts = ', '.join(f"{name}: {len(items)}" for name, items in message['articles'].items())
+        print(f"Cycle {message['cycle']} ({message['scraped_at']}): {counts}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape coordinator for sharded bot deployments")
+    parser.add_argument('--socket', default='/tmp/cyberbot.sock',
+                        help="Unix socket to publish on (default: /tmp/cyberbot.sock)")
+    parser.add_argument('--interval', type=int, default=900,
+                        help="seconds between scrape cycles (default: 900)")
+    parser.add_argument('--listen', action='store_true',
+                        help="connect to a running coordinator and print what it publishes")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.listen:
+            asyncio.run(print_cycles(args.socket))
+        else:
+            asyncio.run(Coordinator(args.socket, args.interval).run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
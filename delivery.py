@@ -0,0 +1,160 @@
+"""Fan-out delivery of bot messages to many channels
+
+Messages are rendered once into Discord API payloads and posted to every
+recipient concurrently. Channels with a webhook (see !use_webhook) get the
+payload POSTed straight to the webhook over one shared HTTP session; other
+channels fall back to a normal send through the bot's gateway session.
+"""
+import asyncio
+import aiohttp
+import discord
+from collections import OrderedDict
+
+# Channels posted to at once
+DELIVERY_CONCURRENCY = 10
+
+# Discord allows at most this many embeds in one message
+MAX_EMBEDS_PER_MESSAGE = 10
+
+# Rendered article embeds, reused across digests and channels
+EMBED_CACHE_SIZE = 500
+_embed_cache = OrderedDict()
+
+_session = None
+
+def get_session():
+    """Shared HTTP session, so webhook posts reuse connections"""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15))
+    return _session
+
+async def close_session():
+    """Close the shared HTTP session; called when the bot shuts down"""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+def render(content=None, embeds=()):
+    """Render one message into an API payload, shared by all recipients"""
+    payload = {}
+    if content:
+        payload['content'] = content
+    if embeds:
+        payload['embeds'] = [embed.to_dict() for embed in embeds]
+    return payload
+
+def render_article_embed(article, color):
+    """Embed payload for one article, rendered once per article and color"""
+    key = (article.get('id') or article['link'], color)
+    if key in _embed_cache:
+        _embed_cache.move_to_end(key)
+        return _embed_cache[key]
+
+    embed = discord.Embed(
+        title=article['title'],
+        url=article['link'],
+        description=article['description'],
+        color=color
+    )
+    embed.set_footer(text=f"Source: {article['source']}")
+    _embed_cache[key] = embed.to_dict()
+    if len(_embed_cache) > EMBED_CACHE_SIZE:
+        _embed_cache.popitem(last=False)
+    return _embed_cache[key]
+
+def render_with_embeds(content, embed_payloads):
+    """Payloads for a message with pre-rendered embeds, split at Discord's embed limit"""
+    payloads = []
+    for start in range(0, max(1, len(embed_payloads)), MAX_EMBEDS_PER_MESSAGE):
+        payload = {}
+        if content and start == 0:
+            payload['content'] = content
+        chunk = embed_payloads[start:start + MAX_EMBEDS_PER_MESSAGE]
+        if chunk:
+            payload['embeds'] = chunk
+        payloads.append(payload)
+    return payloads
+
+async def _retry_after(response, default=1.0):
+    """Seconds to wait after a 429, from the header or Discord's JSON body
+
+    Rate limits from Cloudflare can come as HTML or an empty body, so
+    anything unreadable falls back to `default`.
+    """
+    try:
+        return float(response.headers['Retry-After'])
+    except (KeyError, ValueError):
+        pass
+    try:
+        data = await response.json(content_type=None)
+        return float(data.get('retry_after', default))
+    except (ValueError, TypeError, AttributeError):
+        return default
+
+async def post_webhook(url, payload, max_retries=3):
+    """POST a payload to a webhook, retrying rate limits and server errors
+
+    Returns the final HTTP status (204/200 on success, None if every
+    attempt failed to connect).
+    """
+    status = None
+    for attempt in range(max_retries):
+        try:
+            async with get_session().post(url, json=payload) as response:
+                status = response.status
+                if status == 429:
+                    await asyncio.sleep(await _retry_after(response))
+                    continue
+                if status >= 500:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                return status
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"  Webhook attempt {attempt + 1} failed: {e}")
+            await asyncio.sleep(2 ** attempt)
+    return status
+
+async def _send_via_bot(channel, payload):
+    embeds = [discord.Embed.from_dict(data) for data in payload.get('embeds', [])]
+    await channel.send(content=payload.get('content'), embeds=embeds)
+
+async def _deliver_to_channel(bot, channel_id, payloads, webhooks, limit):
+    """Send payloads to one channel, in order"""
+    async with limit:
+        url = webhooks.get(str(channel_id))
+        channel = bot.get_channel(channel_id)
+
+        for payload in payloads:
+            if url:
+                status = await post_webhook(url, payload)
+                if status is not None and status < 300:
+                    continue
+                print(f"  Webhook for channel {channel_id} failed (status {status}), using bot")
+                if status in (401, 404):
+                    # Webhook was deleted; forget it so we stop trying
+                    webhooks.pop(str(channel_id), None)
+                    url = None
+            if channel is None:
+                return False
+            await _send_via_bot(channel, payload)
+        return True
+
+async def deliver(bot, channel_ids, payloads, webhooks):
+    """Send the same rendered payloads to every channel in `channel_ids`
+
+    Channels are delivered to concurrently, at most DELIVERY_CONCURRENCY at
+    a time; messages within a channel keep their order. `webhooks` maps
+    channel IDs (as strings) to webhook URLs and loses entries for webhooks
+    that no longer exist. Returns the number of channels delivered to.
+    """
+    limit = asyncio.Semaphore(DELIVERY_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_deliver_to_channel(bot, channel_id, payloads, webhooks, limit) for channel_id in channel_ids),
+        return_exceptions=True
+    )
+    for channel_id, result in zip(channel_ids, results):
+        if isinstance(result, Exception):
+            print(f"  Delivery to channel {channel_id} failed: {result}")
+    return sum(1 for result in results if result is True)
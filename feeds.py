@@ -0,0 +1,133 @@
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import html
+import re
+from fetcher import fetch
+
+# Feeds published by each source
+FEED_URLS = {
+    'Bleeping Computer': 'https://www.bleepingcomputer.com/feed/',
+    'WIRED': 'https://www.wired.com/feed/category/security/latest/rss',
+    'Ars Technica': 'https://feeds.arstechnica.com/arstechnica/security',
+    'Krebs on Security': 'https://krebsonsecurity.com/feed/',
+    'Darknet Diaries': 'https://podcast.darknetdiaries.com/'
+}
+
+# Items already read from each feed, newest first, keyed by feed URL
+feed_cache = {}
+
+# Most items remembered per feed
+FEED_CACHE_SIZE = 50
+
+def _local_name(tag):
+    """Strip the XML namespace from a tag name"""
+    return tag.rsplit('}', 1)[-1]
+
+def _clean_text(text):
+    """Turn an HTML feed description into plain text"""
+    text = re.sub(r'<[^>]+>', ' ', text or '')
+    return ' '.join(html.unescape(text).split())
+
+def parse_timestamp(value):
+    """Parse an RSS (RFC 822) or Atom (ISO 8601) timestamp"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+def _read_item(elem, source):
+    """Build an article dict from an RSS <item> or Atom <entry>"""
+    fields = {}
+    for child in elem:
+        name = _local_name(child.tag)
+        if name == 'link':
+            # Atom puts the URL in href; only take the alternate link
+            href = child.get('href')
+            if href and child.get('rel', 'alternate') == 'alternate':
+                fields['link'] = href
+            elif child.text:
+                fields.setdefault('link', child.text.strip())
+        elif name not in fields:
+            fields[name] = child.text or ''
+
+    link = fields.get('link', '')
+    published = parse_timestamp(
+        fields.get('pubDate') or fields.get('published') or fields.get('updated')
+    )
+    description = _clean_text(fields.get('description') or fields.get('summary'))
+
+    return {
+        'id': (fields.get('guid') or fields.get('id') or link).strip(),
+        'title': _clean_text(fields.get('title')),
+        'link': link,
+        'description': (description or "No description")[:200],
+        # Normalised to UTC so the ISO strings sort chronologically
+        'published': published.astimezone(timezone.utc).isoformat() if published else None,
+        'source': source
+    }
+
+def parse_feed(stream, source, seen_ids=(), limit=5):
+    """Stream-parse an RSS or Atom feed
+
+    Stops as soon as `limit` items have been read or an item whose ID is in
+    `seen_ids` is reached, so the rest of the document is never parsed.
+    Returns (items, reached_seen).
+    """
+    items = []
+    for event, elem in ET.iterparse(stream, events=('end',)):
+        if _local_name(elem.tag) not in ('item', 'entry'):
+            continue
+        item = _read_item(elem, source)
+        elem.clear()
+        if item['id'] in seen_ids:
+            return items, True
+        items.append(item)
+        if len(items) >= limit:
+            break
+    return items, False
+
+def scrape_feed(url, source, limit=5):
+    """Fetch the newest items of a feed, reading only what hasn't been seen
+
+    Items already read on an earlier call are kept in `feed_cache`, so the
+    response is closed as soon as the parser reaches a known item. New and
+    cached items are merged and ordered by their publish timestamps, newest
+    first; items without one keep their feed position after the dated ones.
+    """
+    print(f"Fetching {url}...")
+
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    cached = feed_cache.get(url, [])
+    # Stopping at a known item only helps if the cache can fill the rest
+    seen_ids = {item['id'] for item in cached} if len(cached) >= limit else ()
+
+    response = fetch(url, headers, stream=True, expect_feed=True)
+    try:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        items, reached_seen = parse_feed(response.raw, source, seen_ids, limit)
+    finally:
+        response.close()
+
+    if reached_seen:
+        items = items + cached
+    # ISO strings in UTC sort chronologically; sorted() is stable for ties
+    items = sorted(items, key=lambda item: item['published'] or '', reverse=True)
+    if items:
+        feed_cache[url] = items[:FEED_CACHE_SIZE]
+    items = items[:limit]
+
+    print(f"✓ {source} (feed): {len(items)} articles")
+    return items
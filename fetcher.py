@@ -0,0 +1,161 @@
+import re
+import requests
+import threading
+import time
+from datetime import date
+from urllib.parse import urlsplit
+
+# One session for every scraper request, so connections to each host are
+# reused between polls. Tools such as loadtest.py mount adapters on it to
+# redirect traffic.
+session = requests.Session()
+
+# Politeness limits per host: a steady rate with a small burst allowance,
+# and a cap on requests per day
+HOST_RATE = 0.5         # requests per second
+HOST_BURST = 3
+DAILY_BUDGET = 500
+
+# Cheap signs that a 200 response is a block or error page, not content.
+# Only the page title and the start of the body are checked, before any
+# parsing; news pages can mention CAPTCHAs in headlines, so body markers
+# are limited to challenge-script names.
+TITLE_BLOCK_MARKERS = (
+    'just a moment',
+    'attention required',
+    'access denied',
+    'are you a robot',
+    'captcha',
+    'human verification',
+    '404 not found',
+    'page not found'
+)
+BODY_BLOCK_MARKERS = (
+    b'_cf_chl_opt',
+    b'cf-challenge'
+)
+
+class BlockedResponse(Exception):
+    """The site answered with a block, CAPTCHA or error page instead of content"""
+
+class BudgetExhausted(Exception):
+    """The daily request budget for a host is used up"""
+
+class HostThrottle:
+    """Token bucket for one host
+
+    Callers wait their turn in arrival order rather than racing for tokens,
+    so a burst of commands is served fairly instead of failing.
+    """
+
+    def __init__(self, rate, burst, budget):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.budget = budget
+        self.budget_day = date.today()
+        self.used_today = 0
+        self.condition = threading.Condition()
+        self.next_ticket = 0
+        self.serving = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        return now
+
+    def acquire(self):
+        """Block until this caller may send a request"""
+        with self.condition:
+            if date.today() != self.budget_day:
+                self.budget_day = date.today()
+                self.used_today = 0
+            if self.used_today >= self.budget:
+                raise BudgetExhausted(f"daily budget of {self.budget} requests used up")
+            self.used_today += 1
+
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            while True:
+                if ticket == self.serving:
+                    now = self._refill()
+                    if self.tokens >= 1 and now >= self.updated:
+                        self.tokens -= 1
+                        self.serving += 1
+                        self.condition.notify_all()
+                        return
+                    wait = max(0.0, self.updated - now) + (1 - self.tokens) / self.rate
+                else:
+                    wait = None
+                self.condition.wait(wait)
+
+    def back_off(self, seconds):
+        """Hold all requests to this host for `seconds` (e.g. after a 429)"""
+        with self.condition:
+            self.tokens = 0
+            self.updated = max(self.updated, time.monotonic() + seconds)
+
+throttles = {}
+throttles_lock = threading.Lock()
+
+def get_throttle(url):
+    host = urlsplit(url).netloc
+    with throttles_lock:
+        if host not in throttles:
+            throttles[host] = HostThrottle(HOST_RATE, HOST_BURST, DAILY_BUDGET)
+        return throttles[host]
+
+def _retry_after(response, default=60):
+    try:
+        return float(response.headers.get('Retry-After', default))
+    except ValueError:
+        return default
+
+def looks_blocked(content):
+    """Check the start of a page for block, CAPTCHA or soft-404 signs"""
+    head = content[:16384]
+    match = re.search(rb'<title[^>]*>(.*?)</title>', head, re.IGNORECASE | re.DOTALL)
+    if match:
+        title = match.group(1).decode('utf-8', 'replace').lower()
+        if any(marker in title for marker in TITLE_BLOCK_MARKERS):
+            return True
+    return any(marker in head for marker in BODY_BLOCK_MARKERS)
+
+def fetch(url, headers=None, stream=False, expect_feed=False, timeout=10):
+    """GET a URL under the host's rate limit and daily budget
+
+    Raises BlockedResponse for rate-limit and block responses, and for
+    bodies that look like a CAPTCHA or error page, so callers never parse
+    one as "no articles". Other HTTP errors are left to raise_for_status.
+    A feed URL that serves an ordinary HTML page raises ValueError, so the
+    caller can fall back to the site's HTML scraper.
+    """
+    throttle = get_throttle(url)
+    throttle.acquire()
+
+    response = session.get(url, headers=headers, timeout=timeout, stream=stream)
+
+    if response.status_code in (403, 429, 503):
+        if response.status_code != 403:
+            throttle.back_off(_retry_after(response))
+        response.close()
+        raise BlockedResponse(f"{url} answered {response.status_code}")
+
+    if response.status_code != 200:
+        return response
+
+    content_type = response.headers.get('Content-Type', '').lower()
+    if expect_feed and 'html' in content_type:
+        content = response.content
+        response.close()
+        if looks_blocked(content):
+            raise BlockedResponse(f"{url} returned a block or error page")
+        raise ValueError(f"{url} returned an HTML page instead of a feed")
+
+    if not stream and looks_blocked(response.content):
+        raise BlockedResponse(f"{url} returned a block or error page")
+
+    return response
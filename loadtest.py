@@ -0,0 +1,243 @@
+"""Offline load test for the bot's command handlers
+
+Drives !news, !ai_summary and !darknet through a fake Discord context while
+every scraper request is answered by a local HTTP server serving synthetic
+feeds and pages. Groq is replaced by a stand-in with a fixed latency. No
+Discord token, Groq key or network access is needed.
+
+Usage:
+    python loadtest.py [--levels 1,2,4,8,16] [--requests 4]
+                       [--upstream-latency 0.05] [--groq-latency 0.5]
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+import bot
+import fetcher
+from feeds import FEED_URLS
+from fetcher import session
+from scraper import HTML_PAGES
+
+COMMANDS = {
+    'news': lambda ctx: bot.get_news.callback(ctx, 'all'),
+    'ai_summary': lambda ctx: bot.ai_summary.callback(ctx, 10),
+    'darknet': lambda ctx: bot.get_darknet.callback(ctx)
+}
+
+# Synthetic upstream content
+
+def _rss(source, count=10):
+    items = "".join(
+        f"<item><title>{source} story {i}</title>"
+        f"<link>https://example.com/{source.replace(' ', '-').lower()}/episode/{i}/</link>"
+        f"<guid>{source}-{i}</guid>"
+        f"<pubDate>Mon, 19 Oct 2026 {10 + i % 10:02d}:00:00 +0000</pubDate>"
+        f"<description>&lt;p&gt;Details about {source} story {i}&lt;/p&gt;</description></item>"
+        for i in range(count, 0, -1)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{source}</title>{items}</channel></rss>'.encode()
+
+def build_fixtures():
+    """Map 'host/path' of every upstream URL to a response body"""
+    fixtures = {}
+    for source, url in FEED_URLS.items():
+        parts = urlsplit(url)
+        fixtures[parts.netloc + parts.path] = _rss(source)
+    for name, (source, url, parser) in HTML_PAGES.items():
+        parts = urlsplit(url)
+        fixtures.setdefault(parts.netloc + parts.path, b"<html><body></body></html>")
+    return fixtures
+
+class UpstreamServer(ThreadingHTTPServer):
+    """Local stand-in for the news sites, counting requests it serves"""
+    daemon_threads = True
+
+    def __init__(self, fixtures, latency):
+        super().__init__(('127.0.0.1', 0), UpstreamHandler)
+        self.fixtures = fixtures
+        self.latency = latency
+        self.requests = 0
+        self.lock = threading.Lock()
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+        body = self.server.fixtures.get(self.path.lstrip('/'))
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml' if body.startswith(b'<?xml') else 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class LocalRedirectAdapter(HTTPAdapter):
+    """Send every request to the local server as http://127.0.0.1/<host><path>"""
+
+    def __init__(self, base_url):
+        super().__init__()
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        parts = urlsplit(request.url)
+        request.url = f"{self.base_url}/{parts.netloc}{parts.path}"
+        return super().send(request, **kwargs)
+
+# Discord and Groq stand-ins
+
+class FakeContext:
+    """Just enough of commands.Context for the command handlers"""
+
+    def __init__(self, channel_id):
+        self.channel = SimpleNamespace(id=channel_id)
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        self.sent += 1
+
+class FakeGroq:
+    """Groq client that answers after a fixed delay, like the real API call"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, messages, **kwargs):
+        # The real client blocks the calling thread for the whole request
+        time.sleep(self.latency)
+        prompt_tokens = sum(len(message['content']) for message in messages) // 4
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Load test summary."))],
+            usage=SimpleNamespace(prompt_tokens=prompt_tokens)
+        )
+
+# Measurement
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+async def monitor_loop_lag(samples, stop, interval=0.01):
+    """Record how late the event loop wakes up from short sleeps"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - start - interval))
+
+async def run_level(concurrency, per_user, mix):
+    """Run `concurrency` simulated users, each issuing `per_user` commands"""
+    latencies = {name: [] for name in mix}
+    lag = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop_lag(lag, stop))
+
+    async def user(user_id):
+        ctx = FakeContext(channel_id=user_id)
+        for i in range(per_user):
+            name = mix[(user_id + i) % len(mix)]
+            start = time.perf_counter()
+            await COMMANDS[name](ctx)
+            latencies[name].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(user_id) for user_id in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await monitor
+    return latencies, lag, elapsed
+
+def report(concurrency, latencies, lag, elapsed, upstream_requests):
+    all_latencies = [value for values in latencies.values() for value in values]
+    print(f"concurrency {concurrency:>3}: {len(all_latencies)} commands in {elapsed:.2f}s "
+          f"({len(all_latencies) / elapsed:.1f}/s), upstream {upstream_requests / elapsed:.1f} req/s")
+    for name, values in latencies.items():
+        if values:
+            print(f"    {name:<11} p50 {percentile(values, 50) * 1000:7.0f}ms  "
+                  f"p95 {percentile(values, 95) * 1000:7.0f}ms  p99 {percentile(values, 99) * 1000:7.0f}ms")
+    print(f"    loop lag    p50 {percentile(lag, 50) * 1000:7.0f}ms  "
+          f"p99 {percentile(lag, 99) * 1000:7.0f}ms  max {max(lag, default=0) * 1000:7.0f}ms")
+
+async def main_async(args):
+    server = UpstreamServer(build_fixtures(), args.upstream_latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    adapter = LocalRedirectAdapter(f"http://127.0.0.1:{server.server_address[1]}")
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    bot.groq_client = FakeGroq(args.groq_latency)
+    fetcher.HOST_RATE = args.host_rate
+    if args.host_burst is not None:
+        fetcher.HOST_BURST = args.host_burst
+    fetcher.DAILY_BUDGET = 10 ** 9
+    mix = [name.strip() for name in args.commands.split(',')]
+
+    try:
+        for concurrency in args.levels:
+            # Start every level from a clean de-dup state
+            bot.settings['sent_articles'] = {}
+            before = server.requests
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                latencies, lag, elapsed = await run_level(concurrency, args.requests, mix)
+            report(concurrency, latencies, lag, elapsed, server.requests - before)
+    finally:
+        server.shutdown()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the bot's commands")
+    parser.add_argument('--levels', default='1,2,4,8,16',
+                        type=lambda value: [int(level) for level in value.split(',')],
+                        help="concurrent users at each ramp step (default: 1,2,4,8,16)")
+    parser.add_argument('--requests', type=int, default=4,
+                        help="commands each user issues per step (default: 4)")
+    parser.add_argument('--commands', default='news,ai_summary,darknet',
+                        help=f"command mix, cycled per user (from: {', '.join(COMMANDS)})")
+    parser.add_argument('--upstream-latency', type=float, default=0.05,
+                        help="seconds the fake news sites take per request (default: 0.05)")
+    parser.add_argument('--groq-latency', type=float, default=0.5,
+                        help="seconds the fake Groq API takes per call (default: 0.5)")
+    parser.add_argument('--host-rate', type=float, default=1000.0,
+                        help="per-host requests per second; pass 0.5 to test with the production "
+                             "politeness limit (default: effectively unlimited)")
+    parser.add_argument('--host-burst', type=int, default=None,
+                        help=f"per-host burst allowance (default: {fetcher.HOST_BURST}, as in production)")
+    args = parser.parse_args(argv)
+
+    if args.host_rate <= 0:
+        parser.error("--host-rate must be greater than 0")
+    if args.host_burst is not None and args.host_burst < 1:
+        parser.error("--host-burst must be at least 1")
+
+    unknown = [name for name in args.commands.split(',') if name.strip() not in COMMANDS]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+
+    # Keep the real bot_settings.json untouched
+    with tempfile.TemporaryDirectory() as directory:
+        bot.SETTINGS_FILE = os.path.join(directory, 'bot_settings.json')
+        asyncio.run(main_async(args))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Two-stage scrape pipeline: fetch on threads, parse in a process pool
+
+BeautifulSoup parsing is CPU-bound and holds the GIL, so parsing HTML on
+the fetching threads serialises every source. Here fetcher threads only
+download bytes and hand them to a process pool for extraction. A bounded
+number of parse jobs may be queued at once; fetchers wait for a free slot
+when the parse stage falls behind.
+
+The process pool is started on first use and kept for the life of the
+process, so a long-running bot or coordinator pays worker start-up once
+rather than on every scrape. Workers are spawned rather than forked: the
+pool is started from worker threads of an already multi-threaded process,
+and a forked child can deadlock on a lock another thread held at the time.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+from fetcher import BlockedResponse, BudgetExhausted
+from scraper import HTML_PAGES, fetch_page, normalize_episodes, try_feed
+
+_parse_pool = None
+_parse_workers = None
+_parse_pool_lock = threading.Lock()
+
+def _quiet_worker():
+    """Send parser output in worker processes to stderr, away from results"""
+    sys.stdout = sys.stderr
+
+def get_parse_pool(workers=None):
+    """The shared parse pool; `workers` only applies when it is first started"""
+    global _parse_pool, _parse_workers
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_workers = workers or os.cpu_count() or 1
+            _parse_pool = ProcessPoolExecutor(
+                max_workers=_parse_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_quiet_worker
+            )
+        return _parse_pool, _parse_workers
+
+def _discard_parse_pool(pool):
+    """Drop a pool whose worker died, so the next scrape starts a fresh one"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False)
+
+def _fetch_with_retry(url, max_retries=3):
+    """Download a page, retrying like scrape_with_retry does"""
+    for attempt in range(max_retries):
+        try:
+            return fetch_page(url)
+        except (BlockedResponse, BudgetExhausted):
+            raise
+        except Exception as e:
+            print(f"  Attempt {attempt + 1} failed: {e}")
+            if attempt == max_retries - 1:
+                raise
+            time.sleep(2)
+
+def _fetch_stage(name, limit, parse_pool, slots):
+    """Fetch one source
+
+    Feeds are parsed while streaming, which is cheap, so their articles are
+    returned directly. HTML pages are queued on the parse pool and the
+    parse Future is returned instead.
+    """
+    articles = try_feed(name, limit)
+    if articles:
+        return articles
+    source, url, parser = HTML_PAGES[name]
+
+    content = _fetch_with_retry(url)
+
+    # Back-pressure: wait here while the parse stage is full
+    slots.acquire()
+    future = parse_pool.submit(parser, content, limit)
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+def _finish(name, articles):
+    if name == 'darknet':
+        articles = normalize_episodes(articles)
+    print(f"✓ {HTML_PAGES[name][0]}: {len(articles)} articles")
+    return articles
+
+def scrape_pipelined(names, limit=5, parallel=4, parse_workers=None, max_pending=None):
+    """Scrape sources through the fetch and parse stages
+
+    Yields (name, articles) for each source as soon as it is done. A source
+    that fails in either stage yields an empty list.
+    """
+    parse_pool, workers = get_parse_pool(parse_workers)
+    slots = threading.BoundedSemaphore(max_pending or workers * 2)
+
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as fetch_pool:
+        owners = {
+            fetch_pool.submit(_fetch_stage, name, limit, parse_pool, slots): name
+            for name in names
+        }
+        pending = set(owners)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = owners.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        _discard_parse_pool(parse_pool)
+                    print(f"Error scraping {HTML_PAGES[name][0]}: {e}")
+                    yield name, []
+                    continue
+
+                if isinstance(result, Future):
+                    # Fetched HTML, now waiting on the parse stage
+                    owners[result] = name
+                    pending.add(result)
+                else:
+                    yield name, _finish(name, result)
+
+def scrape_sources(names, limit=5, parallel=4):
+    """Scrape sources through the pipeline; returns {name: articles}"""
+    return dict(scrape_pipelined(names, limit, parallel))
@@ -0,0 +1,122 @@
+"""Compact article lists into short prompts for the AI summary
+
+Scraped articles repeat themselves: the same story shows up on several
+sites, descriptions are often the "No description" placeholder, and the
+verbose Title/Source/Description layout spends tokens on labels. This
+module cleans and de-duplicates articles, ranks them by the active
+keywords and packs as many as fit into a token budget.
+"""
+import html
+import re
+
+PLACEHOLDER_DESCRIPTIONS = {'', 'no description'}
+
+# Titles sharing at least this fraction of words are treated as one story
+DUPLICATE_THRESHOLD = 0.7
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token for English text)"""
+    return (len(text) + 3) // 4
+
+def normalize_text(text):
+    """Unescape entities and collapse whitespace"""
+    return ' '.join(html.unescape(text or '').split())
+
+def _has_description(article):
+    return article['description'].lower() not in PLACEHOLDER_DESCRIPTIONS
+
+def _words(article):
+    """Words of the title and description, leaving out placeholder descriptions"""
+    text = article['title']
+    if _has_description(article):
+        text += ' ' + article['description']
+    return set(re.findall(r'[a-z0-9]+', text.lower()))
+
+def _similarity(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def dedupe_articles(articles):
+    """Drop articles whose title+description nearly matches an earlier one"""
+    kept = []
+    kept_words = []
+    for article in articles:
+        words = _words(article)
+        if any(_similarity(words, other) >= DUPLICATE_THRESHOLD for other in kept_words):
+            continue
+        kept.append(article)
+        kept_words.append(words)
+    return kept
+
+def relevance(article, keywords):
+    """Score an article by keyword hits, counting title hits double"""
+    title = article['title'].lower()
+    description = article['description'].lower()
+    score = 0
+    for keyword in keywords:
+        keyword = keyword.lower()
+        score += 2 * title.count(keyword) + description.count(keyword)
+    return score
+
+def verbose_articles_text(articles):
+    """The original prompt layout, used to measure tokens saved"""
+    return "\n\n".join([
+        f"Article {i+1}:\nTitle: {a['title']}\nSource: {a['source']}\nDescription: {a['description']}"
+        for i, a in enumerate(articles)
+    ])
+
+def _compact_line(index, article):
+    line = f"{index}. [{article['source']}] {article['title']}"
+    if _has_description(article) and \
+            not article['title'].lower().startswith(article['description'].lower()):
+        line += f" - {article['description']}"
+    return line
+
+def build_articles_text(articles, keywords=(), max_articles=10, token_budget=1500):
+    """Build the compact article list for the summary prompt
+
+    All articles are cleaned, de-duplicated and ranked before the top
+    `max_articles` are taken, then as many as fit `token_budget` are used.
+    Returns (text, stats) where stats holds the article counts and the
+    estimated tokens of the used articles in the verbose and compact
+    layouts.
+    """
+    cleaned = [
+        dict(article,
+             title=normalize_text(article['title']),
+             description=normalize_text(article['description']))
+        for article in articles
+    ]
+    unique = dedupe_articles(cleaned)
+
+    if keywords:
+        # sorted() is stable, so equally relevant articles keep source order
+        unique = sorted(unique, key=lambda article: relevance(article, keywords), reverse=True)
+    candidates = unique[:max_articles]
+
+    used = []
+    lines = []
+    used_tokens = 0
+    for article in candidates:
+        line = _compact_line(len(lines) + 1, article)
+        line_tokens = estimate_tokens(line) + 1
+        if lines and used_tokens + line_tokens > token_budget:
+            break
+        used.append(article)
+        lines.append(line)
+        used_tokens += line_tokens
+
+    text = "\n".join(lines)
+    tokens_before = estimate_tokens(verbose_articles_text(used))
+    tokens_after = estimate_tokens(text)
+    stats = {
+        'articles_in': len(articles),
+        'duplicates_removed': len(cleaned) - len(unique),
+        'articles_used': len(used),
+        'budget_dropped': len(candidates) - len(used),
+        'tokens_before': tokens_before,
+        'tokens_after': tokens_after,
+        'tokens_saved': tokens_before - tokens_after
+    }
+    return text, stats
@@ -0,0 +1,114 @@
+"""Run the scrapers headless and write articles as JSON Lines
+
+Usage:
+    python scrape_cli.py [--sources bleeping,wired] [--since 2026-10-01]
+                         [--limit 20] [--parallel 4] [--parse-workers 4]
+                         [--output FILE]
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+from datetime import datetime, timezone
+
+from pipeline import scrape_pipelined
+from scraper import SOURCES, normalize_article
+
+def parse_since(value):
+    """Parse --since as an ISO date or datetime, assuming UTC"""
+    try:
+        since = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {value!r} (use YYYY-MM-DD or an ISO datetime)")
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return since
+
+def positive_int(value):
+    """Parse an integer option that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def parse_sources(value):
+    """Parse --sources as a comma separated list of source names"""
+    names = [name.strip().lower() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SOURCES]
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"unknown source(s): {', '.join(unknown)} (choose from {', '.join(SOURCES)})"
+        )
+    return names
+
+def is_since(article, since):
+    """Keep articles published at or after `since`
+
+    HTML-scraped articles carry no timestamp, so they are always kept.
+    """
+    if since is None or not article.get('published'):
+        return True
+    return datetime.fromisoformat(article['published']) >= since
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Scrape cybersecurity news sources and print articles as JSON Lines"
+    )
+    parser.add_argument('--sources', type=parse_sources, default=list(SOURCES),
+                        help=f"comma separated sources (default: all of {','.join(SOURCES)})")
+    parser.add_argument('--since', type=parse_since, default=None,
+                        help="only articles published at or after this date/datetime (UTC)")
+    parser.add_argument('--limit', type=positive_int, default=5,
+                        help="maximum articles per source (default: 5)")
+    parser.add_argument('--parallel', type=int, default=4,
+                        help="number of sources fetched at once (default: 4)")
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help="processes used to parse HTML pages (default: CPU count)")
+    parser.add_argument('--output', '-o', default='-',
+                        help="file to write JSON Lines to (default: stdout)")
+    return parser
+
+def run(sources, since=None, limit=5, parallel=4, parse_workers=None, out=sys.stdout):
+    """Scrape `sources` concurrently, writing each article as one JSON line
+
+    Every line has the same keys (see normalize_article), whether the
+    article came from a feed or an HTML page. Returns the number of articles written.
+    """
+    written = 0
+    for name, articles in scrape_pipelined(sources, limit, parallel, parse_workers):
+        for article in map(normalize_article, articles):
+            if is_since(article, since):
+                out.write(json.dumps(article) + '\n')
+                written += 1
+        out.flush()
+    return written
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.output == '-':
+        out = sys.stdout
+    else:
+        out = open(args.output, 'w')
+
+    start = time.perf_counter()
+    try:
+        # The scrapers print progress; keep stdout clean for the JSON output
+        with contextlib.redirect_stdout(sys.stderr):
+            written = run(args.sources, args.since, args.limit, args.parallel,
+                          args.parse_workers, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"{written} articles from {len(args.sources)} sources in {elapsed:.2f}s "
+          f"({written / elapsed if elapsed else 0:.1f} articles/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,11 @@
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime
+import hashlib
+import re
 import time
+from urllib.parse import urlsplit
+from feeds import FEED_URLS, scrape_feed
+from fetcher import BlockedResponse, BudgetExhausted, fetch
 
 def scrape_with_retry(scraper_func, max_retries=3):
     """Retry a scraper function if it fails"""
@@ -11,28 +15,110 @@ def scrape_with_retry(scraper_func, max_retries=3):
             if articles:
                 return articles
             print(f"  Attempt {attempt + 1}: No articles returned")
+        except (BlockedResponse, BudgetExhausted) as e:
+            # Retrying right away is what gets us blocked in the first place
+            print(f"  Attempt {attempt + 1} failed: {e}")
+            break
         except Exception as e:
             print(f"  Attempt {attempt + 1} failed: {e}")
             if attempt < max_retries - 1:
                 time.sleep(2)
     return []
 
-def scrape_bleeping_computer():
-    """Scrape latest cybersecurity news from Bleeping Computer"""
-    url = "https://www.bleepingcomputer.com/"
-    
+def scrape_html(name, limit=5):
+    """Fetch and parse a source's HTML page"""
+    source, url, parser = HTML_PAGES[name]
+    articles = parser(fetch_page(url), limit)
+    print(f"✓ {source}: {len(articles)} articles")
+    return articles
+
+def try_feed(name, limit=5):
+    """Read a source's RSS/Atom feed; None means scrape its HTML page instead
+    
+    A block is re-raised when the feed and the page share a host, since
+    the fallback would only hit a host that just refused us. Feeds served
+    from their own host fall back to the page as for any other failure.
+    """
+    source, url, parser = HTML_PAGES[name]
+    feed_url = FEED_URLS.get(source)
+    if not feed_url:
+        return None
+    try:
+        articles = scrape_feed(feed_url, source, limit)
+        if articles:
+            return articles
+        print(f"  {source} feed had no items, falling back to HTML")
+    except (BlockedResponse, BudgetExhausted) as e:
+        if urlsplit(feed_url).netloc == urlsplit(url).netloc:
+            raise
+        print(f"  {source} feed failed ({e}), falling back to HTML")
+    except Exception as e:
+        print(f"  {source} feed failed ({e}), falling back to HTML")
+    return None
+
+def scrape_feed_first(name, limit=5):
+    """Read a source's RSS/Atom feed, falling back to scraping its HTML page"""
+    return try_feed(name, limit) or scrape_html(name, limit)
+
+def scrape_bleeping_computer(limit=5):
+    """Latest cybersecurity news from Bleeping Computer"""
+    return scrape_feed_first('bleeping', limit)
+
+def scrape_wired_security(limit=5):
+    """Security news from WIRED"""
+    return scrape_feed_first('wired', limit)
+
+def scrape_ars_technica_security(limit=5):
+    """Security news from Ars Technica"""
+    return scrape_feed_first('ars', limit)
+
+def scrape_krebs_security(limit=5):
+    """News from Krebs on Security"""
+    return scrape_feed_first('krebs', limit)
+
+def scrape_darknet_diaries(limit=3):
+    """Latest episodes from Darknet Diaries"""
+    return normalize_episodes(scrape_feed_first('darknet', limit))
+
+def normalize_episodes(episodes):
+    """Give feed and page episodes the same 'id' and 'date' fields"""
+    for episode in episodes:
+        # Feed GUIDs differ from the page, so key episodes by URL either way
+        episode['id'] = episode_id(episode['link'])
+        if 'date' not in episode:
+            published = episode.get('published')
+            episode['date'] = datetime.fromisoformat(published).strftime('%B %d, %Y') if published else ""
+    return episodes
+
+def normalize_article(article):
+    """Give every article the same keys, whichever scraper produced it"""
+    return {
+        'id': article.get('id') or article['link'],
+        'title': article['title'],
+        'link': article['link'],
+        'description': article.get('description') or "No description",
+        'published': article.get('published'),
+        'date': article.get('date', ""),
+        'source': article['source']
+    }
+
+def fetch_page(url):
+    """Download a page and return its raw bytes"""
     print(f"Fetching {url}...")
     
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
     }
-    response = requests.get(url, headers=headers, timeout=10)
+    response = fetch(url, headers)
     response.raise_for_status()
-    
-    soup = BeautifulSoup(response.content, 'html.parser')
+    return response.content
+
+def parse_bleeping_computer(content, limit=5):
+    """Parse Bleeping Computer articles out of its homepage"""
+    soup = BeautifulSoup(content, 'html.parser')
     articles = []
     
-    article_cards = soup.find_all('div', class_='bc_latest_news_text')[:5]
+    article_cards = soup.find_all('div', class_='bc_latest_news_text')[:limit]
     
     for card in article_cards:
         try:
@@ -57,25 +143,14 @@ def scrape_bleeping_computer():
             print(f"Error parsing Bleeping Computer article: {e}")
             continue
     
-    print(f"✓ Bleeping Computer: {len(articles)} articles")
     return articles
 
-def scrape_wired_security():
-    """Scrape security news from WIRED"""
-    url = "https://www.wired.com/tag/security/"
-    
-    print(f"Fetching {url}...")
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-    response = requests.get(url, headers=headers, timeout=10)
-    response.raise_for_status()
-    
-    soup = BeautifulSoup(response.content, 'html.parser')
+def parse_wired_security(content, limit=5):
+    """Parse WIRED articles out of its security tag page"""
+    soup = BeautifulSoup(content, 'html.parser')
     articles = []
     
-    article_items = soup.find_all('div', class_='summary-item')[:5]
+    article_items = soup.find_all('div', class_='summary-item')[:limit]
     
     for item in article_items:
         try:
@@ -102,25 +177,14 @@ def scrape_wired_security():
             print(f"Error parsing WIRED article: {e}")
             continue
     
-    print(f"✓ WIRED: {len(articles)} articles")
     return articles
 
-def scrape_ars_technica_security():
-    """Scrape security news from Ars Technica"""
-    url = "https://arstechnica.com/security/"
-    
-    print(f"Fetching {url}...")
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-    response = requests.get(url, headers=headers, timeout=10)
-    response.raise_for_status()
-    
-    soup = BeautifulSoup(response.content, 'html.parser')
+def parse_ars_technica_security(content, limit=5):
+    """Parse Ars Technica articles out of its security section"""
+    soup = BeautifulSoup(content, 'html.parser')
     articles = []
     
-    article_items = soup.find_all('article')[:5]
+    article_items = soup.find_all('article')[:limit]
     
     for item in article_items:
         try:
@@ -147,25 +211,14 @@ def scrape_ars_technica_security():
             print(f"Error parsing Ars Technica article: {e}")
             continue
     
-    print(f"✓ Ars Technica: {len(articles)} articles")
     return articles
 
-def scrape_krebs_security():
-    """Scrape news from Krebs on Security"""
-    url = "https://krebsonsecurity.com/"
-    
-    print(f"Fetching {url}...")
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-    response = requests.get(url, headers=headers, timeout=10)
-    response.raise_for_status()
-    
-    soup = BeautifulSoup(response.content, 'html.parser')
+def parse_krebs_security(content, limit=5):
+    """Parse Krebs on Security posts out of its homepage"""
+    soup = BeautifulSoup(content, 'html.parser')
     articles = []
     
-    article_items = soup.find_all('article', class_='post')[:5]
+    article_items = soup.find_all('article', class_='post')[:limit]
     
     for item in article_items:
         try:
@@ -193,25 +246,19 @@ def scrape_krebs_security():
             print(f"Error parsing Krebs article: {e}")
             continue
     
-    print(f"✓ Krebs on Security: {len(articles)} articles")
     return articles
 
-def scrape_darknet_diaries():
-    """Scrape latest episodes from Darknet Diaries"""
-    url = "https://darknetdiaries.com/episode/"
-    
-    print(f"Fetching {url}...")
-    
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-    response = requests.get(url, headers=headers, timeout=10)
-    response.raise_for_status()
-    
-    soup = BeautifulSoup(response.content, 'html.parser')
+def episode_id(link):
+    """Stable ID for a Darknet Diaries episode, taken from its URL"""
+    match = re.search(r'/episode/([^/?#]+)', link)
+    return match.group(1) if match else link
+
+def parse_darknet_diaries(content, limit=3):
+    """Parse Darknet Diaries episodes out of the episode index page"""
+    soup = BeautifulSoup(content, 'html.parser')
     episodes = []
     
-    episode_headers = soup.find_all('h2')[:3]
+    episode_headers = soup.find_all('h2')[:limit]
     
     for h2 in episode_headers:
         try:
@@ -231,20 +278,87 @@ def scrape_darknet_diaries():
                 date = date_tag.get_text(strip=True) if date_tag else ""
                 
                 episodes.append({
+                    'id': episode_id(link),
                     'title': title,
                     'link': link,
                     'description': description[:250],
                     'date': date,
                     'source': 'Darknet Diaries'
                 })
-                print(f"  Found: {title}")
         except Exception as e:
             print(f"Error parsing Darknet Diaries episode: {e}")
             continue
     
-    print(f"✓ Darknet Diaries: {len(episodes)} episodes")
     return episodes
 
+def content_fingerprint(content):
+    """Hash only the episode listing part of the page
+    
+    Headers, footers and inline scripts can change on every request
+    (nonces, ad slots), so they would make every check look like a change.
+    """
+    start = content.find(b'<h2')
+    end = content.rfind(b'</h2>')
+    if start != -1 and end > start:
+        content = content[start:end]
+    return hashlib.sha256(content).hexdigest()
+
+def check_darknet_diaries_changed(cache):
+    """Fetch Darknet Diaries episodes only if the episode page changed
+    
+    `cache` holds the 'etag', 'last_modified' and 'fingerprint' from the
+    previous check and is updated in place. Sends a conditional GET first,
+    then compares a hash of the listing before doing a full parse.
+    Returns None when nothing changed, otherwise the parsed episodes.
+    """
+    url = "https://darknetdiaries.com/episode/"
+    
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    }
+    if cache.get('etag'):
+        headers['If-None-Match'] = cache['etag']
+    if cache.get('last_modified'):
+        headers['If-Modified-Since'] = cache['last_modified']
+    
+    response = fetch(url, headers)
+    if response.status_code == 304:
+        return None
+    response.raise_for_status()
+    
+    fingerprint = content_fingerprint(response.content)
+    if fingerprint == cache.get('fingerprint'):
+        cache['etag'] = response.headers.get('ETag')
+        cache['last_modified'] = response.headers.get('Last-Modified')
+        return None
+    
+    episodes = parse_darknet_diaries(response.content)
+    # Only remember validators once the page actually parsed, so a broken
+    # page is fetched and looked at again on the next check
+    if episodes:
+        cache['etag'] = response.headers.get('ETag')
+        cache['last_modified'] = response.headers.get('Last-Modified')
+        cache['fingerprint'] = fingerprint
+    return episodes
+
+# Display name, HTML page and parser for each source
+HTML_PAGES = {
+    'bleeping': ('Bleeping Computer', "https://www.bleepingcomputer.com/", parse_bleeping_computer),
+    'wired': ('WIRED', "https://www.wired.com/tag/security/", parse_wired_security),
+    'ars': ('Ars Technica', "https://arstechnica.com/security/", parse_ars_technica_security),
+    'krebs': ('Krebs on Security', "https://krebsonsecurity.com/", parse_krebs_security),
+    'darknet': ('Darknet Diaries', "https://darknetdiaries.com/episode/", parse_darknet_diaries)
+}
+
+# Short source names, as used by !news and the scrape CLI
+SOURCES = {
+    'bleeping': scrape_bleeping_computer,
+    'wired': scrape_wired_security,
+    'ars': scrape_ars_technica_security,
+    'krebs': scrape_krebs_security,
+    'darknet': scrape_darknet_diaries
+}
+
 def scrape_all_sources():
     """Scrape all cybersecurity news sources with retry logic"""
     print("\n" + "="*50)
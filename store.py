@@ -0,0 +1,99 @@
+"""De-dup, subscription and settings store shared by several bot processes
+
+A single SQLite file that every shard opens. SQLite's locking makes the
+"claim this article" check atomic across processes, so two shards never
+both treat the same article as new for the same channel. Bot-wide
+settings (keywords, notification times) live here too, so every shard
+sees the same values whichever one handled the command.
+
+Calls may wait on another process's lock, so the bot runs them on worker
+threads; one connection is shared by those threads under a lock.
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+class SharedStore:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('''CREATE TABLE IF NOT EXISTS sent (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            sent_at TEXT NOT NULL,
+            PRIMARY KEY (scope, key)
+        )''')
+        self.db.execute('''CREATE TABLE IF NOT EXISTS subscriptions (
+            kind TEXT NOT NULL,
+            channel_id INTEGER NOT NULL,
+            PRIMARY KEY (kind, channel_id)
+        )''')
+        self.db.execute('''CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )''')
+
+    def claim(self, scope, keys, hours=24, limit=None):
+        """Mark `keys` as sent in `scope` in one transaction
+
+        Returns the keys that were not already sent in the last `hours`, in
+        order, stopping once `limit` keys have been claimed.
+        """
+        now = datetime.now()
+        cutoff = (now - timedelta(hours=hours)).isoformat()
+        claimed = []
+        with self.lock:
+            self.db.execute('BEGIN IMMEDIATE')
+            try:
+                self.db.execute('DELETE FROM sent WHERE scope = ? AND sent_at <= ?', (scope, cutoff))
+                for key in keys:
+                    if limit is not None and len(claimed) >= limit:
+                        break
+                    cursor = self.db.execute(
+                        'INSERT OR IGNORE INTO sent (scope, key, sent_at) VALUES (?, ?, ?)',
+                        (scope, key, now.isoformat())
+                    )
+                    if cursor.rowcount == 1:
+                        claimed.append(key)
+                self.db.execute('COMMIT')
+            except Exception:
+                self.db.execute('ROLLBACK')
+                raise
+        return claimed
+
+    def count_sent(self, hours=24):
+        """Number of articles sent in the last `hours`, across all scopes"""
+        cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
+        with self.lock:
+            return self.db.execute('SELECT COUNT(*) FROM sent WHERE sent_at > ?', (cutoff,)).fetchone()[0]
+
+    def subscribe(self, kind, channel_id):
+        with self.lock:
+            self.db.execute('INSERT OR IGNORE INTO subscriptions (kind, channel_id) VALUES (?, ?)',
+                            (kind, channel_id))
+
+    def unsubscribe(self, kind, channel_id):
+        with self.lock:
+            self.db.execute('DELETE FROM subscriptions WHERE kind = ? AND channel_id = ?',
+                            (kind, channel_id))
+
+    def channels(self, kind):
+        """Channel IDs subscribed to `kind` ('daily_news' or 'darknet')"""
+        with self.lock:
+            rows = self.db.execute('SELECT channel_id FROM subscriptions WHERE kind = ? ORDER BY channel_id',
+                                   (kind,)).fetchall()
+        return [row[0] for row in rows]
+
+    def get_setting(self, key, default=None):
+        """A bot-wide setting, or `default` if no shard has set it yet"""
+        with self.lock:
+            row = self.db.execute('SELECT value FROM settings WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_setting(self, key, value):
+        with self.lock:
+            self.db.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                            (key, json.dumps(value)))